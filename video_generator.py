@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, csv, time, hashlib, subprocess, re, random, shutil
+import os, csv, time, hashlib, subprocess, re, random, shutil, asyncio, tempfile
 from pathlib import Path
 from datetime import timedelta
+from string import Template
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager
 
-import numpy as np
-from PIL import Image
-from moviepy.editor import VideoFileClip, CompositeVideoClip, VideoClip
-from proglog import ProgressBarLogger
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 
 # ================== TUNING ==================
 SEGMENT_MIN_SEC = 2  # Shorter pause at top
@@ -21,15 +20,29 @@ OVERLAY_W_FRAC_BASE = 0.24
 OVERLAY_W_JITTER    = 0.05
 OVERLAY_POS_JITTER  = 10
 SCROLL_MARGIN       = 28
+SCROLL_MAX_SCREENS  = 3   # Screenshot stops after this many viewports of page
+SCREENSHOT_QUALITY  = 75  # JPEG encodes far faster than PNG; output is 4:2:0 anyway
+GOTO_TIMEOUT_MS     = 20000
+SETTLE_MAX_MS       = 3000  # Hard cap on waiting for the DOM to go quiet
+SETTLE_QUIET_MS     = 500   # DOM counts as settled after this long without mutations
 
 DO_COMPRESS_OVERLAY = True
 OVERLAY_TARGET_W = 1280
 OVERLAY_V_KBPS   = 600
 OVERLAY_A_KBPS   = 96
 
+BROWSER_RECYCLE_ROWS = 50  # Fresh Chromium every N rows to cap memory growth
+ENCODE_CONCURRENCY   = 2   # Consumer GPUs cap concurrent NVENC sessions
+# CPU fallback: cores are split between encode slots
+X264_THREADS = max(1, (os.cpu_count() or 4) // ENCODE_CONCURRENCY)
+
 # Worker configuration
 WORKER_ID = int(os.getenv("WORKER_ID", "0"))
 TOTAL_WORKERS = int(os.getenv("TOTAL_WORKERS", "1"))
+CONCURRENCY = int(os.getenv("CONCURRENCY", "3"))
+
+# Screenshots only live until ffmpeg has read them; keep them in RAM when possible
+SCRATCH_DIR = Path(os.getenv("SCRATCH_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()))
 
 # R2 Configuration
 R2_ENDPOINT = os.getenv("R2_ENDPOINT", "")
@@ -41,29 +54,56 @@ R2_PUBLIC_URL = os.getenv("R2_PUBLIC_URL", "")
 # File Configuration
 CSV_FILENAME = os.getenv("CSV_FILENAME", "master.csv")
 CALENDLY_URL = os.getenv("CALENDLY_URL", "https://calendly.com/heedeestudios/seo-strategy-session")
+# Link results straight to the video and skip the per-row landing page upload
+SKIP_LANDING = os.getenv("SKIP_LANDING", "").lower() in ("1", "true", "yes")
 
 USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
               "AppleWebKit/537.36 (KHTML, like Gecko) "
               "Chrome/124.0.0.0 Safari/537.36")
+# Ads/analytics never affect the screenshot but keep pages from settling
+BLOCKED_HOSTS = ("doubleclick.net", "googletagmanager.com", "googlesyndication.com",
+                 "google-analytics.com", "facebook.net", "hotjar.com", "segment.io",
+                 "mixpanel.com")
+BLOCKED_HOSTS_RE = re.compile(
+    r"^https?://([^/?#]*\.)?(" + "|".join(re.escape(h) for h in BLOCKED_HOSTS) + r")(:\d+)?/"
+)
+DOMAIN_RE = re.compile(r'https?://([^/]+)')
+SLUG_RE = re.compile(r'[^a-z0-9]+')
 ZERO_WIDTH = ''.join(['\ufeff','\u200b','\u200c','\u200d','\u2060','\u200e','\u200f'])
 
-# ================== QUIET LOGGER ==================
-class SilentLogger(ProgressBarLogger):
-    def bars_callback(self, *a, **k):
-        pass
-
 # ================== R2 UPLOAD ==================
+try:
+    from boto3.s3.transfer import TransferConfig
+    # Multipart + threaded transfers above 16MB
+    XFER = TransferConfig(
+        multipart_threshold=16 * 1024 * 1024,
+        multipart_chunksize=16 * 1024 * 1024,
+        max_concurrency=16,
+        io_chunksize=1024 * 1024,
+        use_threads=True
+    )
+except ImportError:
+    XFER = None
+
 def setup_r2_client():
     if not all([R2_ENDPOINT, R2_ACCESS_KEY, R2_SECRET_KEY, R2_BUCKET]):
         return None
     try:
         import boto3
+        from botocore.config import Config
         client = boto3.client(
             's3',
             endpoint_url=R2_ENDPOINT,
             aws_access_key_id=R2_ACCESS_KEY,
             aws_secret_access_key=R2_SECRET_KEY,
-            region_name='auto'
+            region_name='auto',
+            config=Config(
+                max_pool_connections=64,
+                tcp_keepalive=True,
+                connect_timeout=5,
+                read_timeout=60,
+                retries={'max_attempts': 5, 'mode': 'standard'}
+            )
         )
         return client
     except ImportError:
@@ -73,114 +113,134 @@ def setup_r2_client():
         print(f"[WARN] R2 setup failed: {e}")
         return None
 
-def download_overlays_from_r2(csv_path, r2_client, bucket):
-    """Download all unique niche overlays from R2"""
-    print(f"[INFO] Reading CSV to find required overlays: {csv_path}")
-    
-    unique_niches = set()
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            niche = row.get('Niche', '').strip()
-            if niche:
-                unique_niches.add(niche)
+def download_overlays_from_r2(rows, r2_client, bucket):
+    """Download all unique niche overlays used by the (already parsed) rows"""
+    unique_niches = {r["niche"] for r in rows if r["niche"]}
     
     print(f"[INFO] Found {len(unique_niches)} unique niches: {list(unique_niches)}")
     
-    overlays = {}
-    for niche in unique_niches:
+    import fcntl
+    
+    def fetch(niche):
         overlay_filename = f"{niche}.mp4"
         local_path = f"/tmp/{overlay_filename}"
         
         try:
-            print(f"[INFO] Downloading {overlay_filename} from R2...")
-            r2_client.download_file(bucket, overlay_filename, local_path)
-            overlays[niche] = local_path
+            # Workers sharing /tmp reuse one copy while its ETag still matches
+            etag_path = Path(f"{local_path}.etag")
+            with open(f"{local_path}.lock", "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                head = r2_client.head_object(Bucket=bucket, Key=overlay_filename)
+                try:
+                    fresh = (etag_path.read_text() == head["ETag"]
+                             and os.path.getsize(local_path) == head["ContentLength"])
+                except OSError:
+                    fresh = False
+                if fresh:
+                    print(f"[INFO] Reusing {overlay_filename} already on disk")
+                    return local_path
+                print(f"[INFO] Downloading {overlay_filename} from R2...")
+                r2_client.download_file(bucket, overlay_filename, local_path, Config=XFER)
+                etag_path.write_text(head["ETag"])
             print(f"[SUCCESS] Downloaded {overlay_filename}")
+            return local_path
         except Exception as e:
             print(f"[ERROR] Failed to download {overlay_filename}: {e}")
-            overlays[niche] = None
+            return None
+    
+    overlays = {}
+    if not unique_niches:
+        return overlays
+    
+    with ThreadPoolExecutor(max_workers=min(16, len(unique_niches))) as ex:
+        futures = {ex.submit(fetch, niche): niche for niche in unique_niches}
+        for fut in as_completed(futures):
+            overlays[futures[fut]] = fut.result()
     
     return overlays
 
-def upload_to_r2(client, local_path, username):
+async def upload_to_r2(client, local_path, username, tag=""):
     if client is None:
         return None
     try:
         key = f"{username}/video.mp4"
-        client.upload_file(
+        await asyncio.to_thread(
+            client.upload_file,
             str(local_path),
             R2_BUCKET,
             key,
-            ExtraArgs={'ContentType': 'video/mp4'}
+            ExtraArgs={'ContentType': 'video/mp4'},
+            Config=XFER
         )
         return f"{R2_PUBLIC_URL}/{username}/video.mp4"
     except Exception as e:
-        print(f"   -> R2 upload failed: {e}")
+        print(f"{tag} -> R2 upload failed: {e}")
         return None
 
-def upload_thumbnail_to_r2(client, thumbnail_path, username):
+async def upload_thumbnail_to_r2(client, thumbnail_path, username, tag=""):
     """Upload thumbnail to R2"""
     if client is None:
         return None
     try:
         key = f"{username}/thumbnail.jpg"
-        client.upload_file(
+        await asyncio.to_thread(
+            client.upload_file,
             str(thumbnail_path),
             R2_BUCKET,
             key,
-            ExtraArgs={'ContentType': 'image/jpeg'}
+            ExtraArgs={'ContentType': 'image/jpeg'},
+            Config=XFER
         )
         return f"{R2_PUBLIC_URL}/{username}/thumbnail.jpg"
     except Exception as e:
-        print(f"   -> Thumbnail upload failed: {e}")
+        print(f"{tag} -> Thumbnail upload failed: {e}")
         return None
 
-def extract_thumbnail(video_path, thumbnail_path):
+async def extract_thumbnail(video_path, thumbnail_path, tag=""):
     """Extract thumbnail from video at 2 seconds"""
     try:
         cmd = [
-            "ffmpeg", "-y", "-i", str(video_path),
+            "ffmpeg", "-y",
             "-ss", "00:00:02",
-            "-vframes", "1",
+            "-i", str(video_path),
+            "-frames:v", "1",
             "-q:v", "2",
             str(thumbnail_path)
         ]
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        if await proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with {proc.returncode}")
         return True
     except Exception as e:
-        print(f"   -> Thumbnail extraction failed: {e}")
+        print(f"{tag} -> Thumbnail extraction failed: {e}")
         return False
 
-def create_landing_page(client, username, video_url, thumbnail_url):
-    """Create landing page with Open Graph tags"""
-    if client is None:
-        return None
-    
-    html = f"""<!DOCTYPE html>
+LANDING_TMPL = Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Video for {username}</title>
+    <title>Video for $username</title>
     
     <!-- Open Graph tags for social media -->
     <meta property="og:title" content="I recorded this video for you">
-    <meta property="og:description" content="Personalized video message for {username}">
-    <meta property="og:image" content="{thumbnail_url}">
-    <meta property="og:video" content="{video_url}">
+    <meta property="og:description" content="Personalized video message for $username">
+    <meta property="og:image" content="$thumbnail_url">
+    <meta property="og:video" content="$video_url">
     <meta property="og:type" content="video.other">
-    <meta property="og:url" content="{R2_PUBLIC_URL}/{username}/index.html">
+    <meta property="og:url" content="$public_url/$username/index.html">
     
     <!-- Twitter Card tags -->
     <meta name="twitter:card" content="player">
     <meta name="twitter:title" content="I recorded this video for you">
     <meta name="twitter:description" content="Personalized video message">
-    <meta name="twitter:image" content="{thumbnail_url}">
+    <meta name="twitter:image" content="$thumbnail_url">
     
     <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             background: #f5f5f5;
             display: flex;
@@ -189,43 +249,43 @@ def create_landing_page(client, username, video_url, thumbnail_url):
             justify-content: center;
             min-height: 100vh;
             padding: 20px;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             width: 100%;
             background: white;
             border-radius: 12px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
-        h1 {{
+        }
+        h1 {
             text-align: center;
             padding: 40px 20px 20px;
             font-size: 2.5rem;
             color: #333;
-        }}
-        .subtitle {{
+        }
+        .subtitle {
             text-align: center;
             padding: 0 20px 30px;
             font-size: 1.1rem;
             color: #666;
-        }}
-        .video-wrapper {{
+        }
+        .video-wrapper {
             width: 100%;
             padding: 0 40px 40px;
-        }}
-        video {{
+        }
+        video {
             width: 100%;
             max-width: 100%;
             border-radius: 8px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.15);
-        }}
-        .cta-section {{
+        }
+        .cta-section {
             text-align: center;
             padding: 40px 20px;
             background: #f9f9f9;
-        }}
-        .cta-button {{
+        }
+        .cta-button {
             display: inline-block;
             background: #5b4cdb;
             color: white;
@@ -236,24 +296,24 @@ def create_landing_page(client, username, video_url, thumbnail_url):
             border-radius: 8px;
             transition: all 0.3s ease;
             box-shadow: 0 4px 12px rgba(91,76,219,0.3);
-        }}
-        .cta-button:hover {{
+        }
+        .cta-button:hover {
             background: #4a3dc4;
             transform: translateY(-2px);
             box-shadow: 0 6px 16px rgba(91,76,219,0.4);
-        }}
-        @media (max-width: 768px) {{
-            h1 {{
+        }
+        @media (max-width: 768px) {
+            h1 {
                 font-size: 1.8rem;
-            }}
-            .video-wrapper {{
+            }
+            .video-wrapper {
                 padding: 0 20px 30px;
-            }}
-            .cta-button {{
+            }
+            .cta-button {
                 padding: 14px 36px;
                 font-size: 1rem;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
@@ -261,21 +321,35 @@ def create_landing_page(client, username, video_url, thumbnail_url):
         <h1>Hi there</h1>
         <p class="subtitle">I recorded this video for you</p>
         <div class="video-wrapper">
-            <video controls poster="{thumbnail_url}">
-                <source src="{video_url}" type="video/mp4">
+            <video controls poster="$thumbnail_url">
+                <source src="$video_url" type="video/mp4">
                 Your browser does not support the video tag.
             </video>
         </div>
         <div class="cta-section">
-            <a href="{CALENDLY_URL}" class="cta-button">Book a FREE 10 Minute Call</a>
+            <a href="$calendly_url" class="cta-button">Book a FREE 10 Minute Call</a>
         </div>
     </div>
 </body>
-</html>"""
+</html>""")
+
+async def create_landing_page(client, username, video_url, thumbnail_url, tag=""):
+    """Create landing page with Open Graph tags"""
+    if client is None:
+        return None
+    
+    html = LANDING_TMPL.substitute(
+        username=username,
+        video_url=video_url,
+        thumbnail_url=thumbnail_url,
+        public_url=R2_PUBLIC_URL,
+        calendly_url=CALENDLY_URL
+    )
     
     try:
         key = f"{username}/index.html"
-        client.put_object(
+        await asyncio.to_thread(
+            client.put_object,
             Bucket=R2_BUCKET,
             Key=key,
             Body=html.encode('utf-8'),
@@ -283,22 +357,62 @@ def create_landing_page(client, username, video_url, thumbnail_url):
         )
         return f"{R2_PUBLIC_URL}/{username}/index.html"
     except Exception as e:
-        print(f"   -> Landing page creation failed: {e}")
+        print(f"{tag} -> Landing page creation failed: {e}")
         return None
 
 # ================== HELPER FUNCTIONS ==================
-def check_nvenc():
+FFMPEG_PROBE_CACHE = Path("/tmp/.ffmpeg_probe")
+
+def _probe_ffmpeg_build():
+    """Check the ffmpeg build for h264_nvenc and the CUDA filters (cached on disk)"""
+    try:
+        cached = FFMPEG_PROBE_CACHE.read_text().split()
+        if len(cached) == 2 and set(cached) <= {"0", "1"}:
+            nvenc, cuda = (c == "1" for c in cached)
+            return nvenc, cuda
+    except OSError:
+        pass
     try:
-        result = subprocess.run(
+        encoders = subprocess.run(
             ["ffmpeg","-hide_banner","-encoders"],
             capture_output=True, text=True, timeout=5
-        )
-        if "h264_nvenc" in result.stdout:
-            print("[INFO] NVENC detected: h264_nvenc will be used.")
-        else:
-            print("[WARN] NVENC not found, using libx264.")
-    except Exception as e:
-        print(f"[WARN] ffmpeg check failed: {e}")
+        ).stdout
+    except Exception:
+        return None, False
+    nvenc = "h264_nvenc" in encoders
+    filters = ""
+    if nvenc:
+        try:
+            filters = subprocess.run(
+                ["ffmpeg","-hide_banner","-filters"],
+                capture_output=True, text=True, timeout=5
+            ).stdout
+        except Exception:
+            return nvenc, False
+    cuda = "scale_cuda" in filters and "overlay_cuda" in filters
+    try:
+        FFMPEG_PROBE_CACHE.write_text(f"{int(nvenc)} {int(cuda)}")
+    except OSError:
+        pass
+    return nvenc, cuda
+
+def _probe_ffmpeg():
+    """(nvenc, cuda_filters) usable on this node: built in and a GPU is exposed"""
+    nvenc, cuda = _probe_ffmpeg_build()
+    gpu = Path("/dev/nvidia0").exists()
+    return (nvenc and gpu if nvenc is not None else None), cuda and gpu
+
+NVENC, CUDA_FILTERS = _probe_ffmpeg()
+
+def check_nvenc():
+    if NVENC is None:
+        print("[WARN] ffmpeg check failed, using libx264.")
+    elif NVENC:
+        print("[INFO] NVENC detected: h264_nvenc will be used.")
+        if CUDA_FILTERS:
+            print("[INFO] CUDA filters detected: overlay decode/compose stays on the GPU.")
+    else:
+        print("[WARN] NVENC not found, using libx264.")
 
 def pick_file(title, types):
     try:
@@ -331,7 +445,7 @@ def clean_url(url):
     return url
 
 def domain_from_url(url):
-    m = re.search(r'https?://([^/]+)', url)
+    m = DOMAIN_RE.search(url)
     if m:
         dom = m.group(1)
         dom = dom.replace("www.","")
@@ -340,7 +454,7 @@ def domain_from_url(url):
 
 def safe_slug(s):
     s = s.lower()
-    s = re.sub(r'[^a-z0-9]+', '_', s)
+    s = SLUG_RE.sub('_', s)
     s = s.strip('_')
     if not s:
         s = f"video_{int(time.time())}"
@@ -348,6 +462,7 @@ def safe_slug(s):
 
 def load_rows(csv_path):
     rows = []
+    taken = set()
     with open(csv_path, 'r', encoding='utf-8-sig') as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -355,50 +470,227 @@ def load_rows(csv_path):
             username = (row.get("Instagram Username") or row.get("username") or "").strip()
             niche = (row.get("Niche") or row.get("niche") or "").strip()
             if url:
-                rows.append({"url": url, "username": username, "niche": niche})
+                # Unique per run (slugs never contain "-"), since rows run concurrently
+                base = safe_slug(username or domain_from_url(clean_url(url)))
+                slug, n = base, 1
+                while slug in taken:
+                    n += 1
+                    slug = f"{base}-{n}"
+                taken.add(slug)
+                rows.append({"url": url, "username": username, "niche": niche, "slug": slug})
     return rows
 
-def capture_fullpage_png(page, url, out_png, width, height):
-    """✅ FIXED: Simple, reliable screenshot function"""
+async def launch_browser(pw):
+    return await pw.chromium.launch(headless=True, args=["--disable-gpu","--no-sandbox"])
+
+async def _abort_route(route):
+    await route.abort()
+
+async def new_context(browser):
+    context = await browser.new_context(
+        viewport={"width": WIDTH, "height": HEIGHT},
+        user_agent=USER_AGENT,
+        java_script_enabled=True,
+        ignore_https_errors=True,
+        device_scale_factor=1.0,
+        extra_http_headers={"Accept-Language": "en-US,en;q=0.9"}
+    )
+    await context.route(BLOCKED_HOSTS_RE, _abort_route)
+    return context
+
+CLEAR_STORAGE_JS = """async () => {
+    try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+    try { for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name); } catch (e) {}
+    try { for (const r of await navigator.serviceWorker.getRegistrations()) await r.unregister(); } catch (e) {}
+    try { for (const k of await caches.keys()) await caches.delete(k); } catch (e) {}
+}"""
+STORAGE_CLEAR_TIMEOUT = 5
+
+class ContextPool:
+    """One context + page per row slot; storage cleared between rows, Chromium recycled"""
+    def __init__(self, pw, size, recycle):
+        self.pw = pw
+        self.recycle = recycle
+        self.slots = asyncio.Queue()
+        self.lock = asyncio.Lock()
+        self.browser = None
+        self.leases = 0
+        self.active = {}  # browser -> leases still out
+        for _ in range(size):
+            self.slots.put_nowait(None)
+
+    async def _checkout(self):
+        async with self.lock:
+            if self.browser is None or self.leases >= self.recycle:
+                old = self.browser
+                self.browser = await launch_browser(self.pw)
+                self.leases = 0
+                self.active[self.browser] = 0
+                if old is not None and not self.active[old]:
+                    await self._close_browser(old)
+            self.leases += 1
+            self.active[self.browser] += 1
+            return self.browser
+
+    async def _checkin(self, browser):
+        self.active[browser] -= 1
+        if browser is not self.browser and not self.active[browser]:
+            await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        del self.active[browser]
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def lease(self):
+        slot = await self.slots.get()
+        try:
+            browser = await self._checkout()
+        except Exception:
+            self.slots.put_nowait(slot)
+            raise
+        try:
+            if slot is not None and slot[0] is not browser:
+                try:
+                    await slot[1].close()  # From a retired browser
+                except Exception:
+                    pass
+                slot = None
+            if slot is None:
+                context = await new_context(browser)
+                slot = (browser, context, await context.new_page())
+        except Exception:
+            self.slots.put_nowait(None)
+            await self._checkin(browser)
+            raise
+        _, context, page = slot
+        try:
+            yield page
+        finally:
+            try:
+                if len(context.pages) != 1:
+                    raise RuntimeError("popup/page leak")
+                await asyncio.wait_for(page.evaluate(CLEAR_STORAGE_JS), STORAGE_CLEAR_TIMEOUT)
+                await page.goto("about:blank")
+                await context.clear_cookies()
+            except Exception:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+                slot = None
+            self.slots.put_nowait(slot)
+            await self._checkin(browser)
+
+    async def close(self):
+        for browser in list(self.active):
+            await self._close_browser(browser)
+        self.browser = None
+
+# Step down through the clip so lazy content loads, then wait for DOM quiet
+SETTLE_JS = """async ([clipEnd, quietMs, maxMs]) => {
+    const frame = () => new Promise(r => { requestAnimationFrame(() => r()); setTimeout(r, 100); });
+    const step = window.innerHeight;
+    const last = Math.min(document.documentElement.scrollHeight, clipEnd) - step;
+    for (let y = step; y < last + step; y += step) {
+        window.scrollTo(0, Math.min(y, last));
+        await frame();
+        await frame();
+    }
+    window.scrollTo(0, 0);
+    await new Promise(resolve => {
+        let timer = null;
+        const done = () => { observer.disconnect(); resolve(); };
+        const reset = () => { clearTimeout(timer); timer = setTimeout(done, quietMs); };
+        const observer = new MutationObserver(reset);
+        observer.observe(document, {subtree: true, childList: true, attributes: true});
+        reset();
+        setTimeout(done, maxMs);
+    });
+}"""
+SETTLE_ATTEMPTS = 3
+
+async def settle_page(page, height):
+    """Run SETTLE_JS, re-running it if a redirect replaces the document"""
+    args = [height * SCROLL_MAX_SCREENS, SETTLE_QUIET_MS, SETTLE_MAX_MS]
+    for _ in range(SETTLE_ATTEMPTS):
+        try:
+            await page.evaluate(SETTLE_JS, args)
+            return
+        except PlaywrightError as e:
+            if "Execution context was destroyed" not in str(e):
+                raise
+        try:
+            await page.wait_for_load_state("load", timeout=GOTO_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            pass
+
+async def capture_screenshot(contexts, url, out_jpg, width, height, tag=""):
+    """✅ FIXED: Simple, reliable screenshot function (pooled page per row)"""
     try:
-        page.goto(url, wait_until="domcontentloaded", timeout=30000)
-        page.wait_for_timeout(2000)
-        page.screenshot(path=str(out_png), full_page=True)
+        async with contexts.lease() as page:
+            await page.goto(url, wait_until="domcontentloaded", timeout=GOTO_TIMEOUT_MS)
+            await settle_page(page, height)
+            page_h = await page.evaluate("document.documentElement.scrollHeight")
+            clip_h = max(height, min(int(page_h or height), height * SCROLL_MAX_SCREENS))
+            await page.screenshot(
+                path=str(out_jpg), type="jpeg", quality=SCREENSHOT_QUALITY, full_page=True,
+                clip={"x": 0, "y": 0, "width": width, "height": clip_h}
+            )
         return True
     except Exception as e:
-        print(f"   -> screenshot failed: {e}")
+        print(f"{tag} -> screenshot failed: {e}")
         return False
 
-def build_scrolling_clip(png_path, w, h, duration, fps, seg_sec):
-    """✅ UPDATED: Create 5-second scroll animation"""
-    img = np.array(Image.open(png_path).convert("RGB"))
-    img_h, img_w, _ = img.shape
-    
-    if img_h <= h:
-        static = np.zeros((h, w, 3), dtype=np.uint8)
-        static[:img_h, :min(img_w, w)] = img[:, :min(img_w, w)]
-        return VideoClip(lambda t: static, duration=duration).set_fps(fps)
-    
-    scroll_dist = img_h - h
-    
-    def make_frame(t):
-        if t < seg_sec:
-            pos = 0
-        elif t >= (duration - seg_sec):
-            pos = scroll_dist
-        else:
-            frac = (t - seg_sec) / (duration - 2*seg_sec)
-            pos = int(frac * scroll_dist)
-        
-        crop = img[pos:pos+h, :min(img_w, w)]
-        if crop.shape[0] < h or crop.shape[1] < w:
-            canvas = np.zeros((h, w, 3), dtype=np.uint8)
-            ch, cw, _ = crop.shape
-            canvas[:ch, :cw] = crop
-            return canvas
-        return crop
-    
-    return VideoClip(make_frame, duration=duration).set_fps(fps)
+def probe_overlay(overlay_path):
+    """Return (width, height, duration) of the overlay's first video stream"""
+    cmd = [
+        "ffprobe","-v","error",
+        "-select_streams","v:0",
+        "-show_entries","stream=width,height:format=duration",
+        "-of","default=noprint_wrappers=1",
+        str(overlay_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    info = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+    try:
+        duration = float(info.get("duration") or 30)
+    except ValueError:
+        duration = 30.0
+    return int(info["width"]), int(info["height"]), duration
+
+def build_filtergraph(w, h, fps, duration, seg_sec, face_w, face_h, x, y, cycle=5.0, gpu=False):
+    """✅ Scroll (pause/scroll/pause every `cycle` s) + face overlay as one ffmpeg filtergraph"""
+    m = f"mod(t,{cycle})"
+    span = max(cycle - 2*seg_sec, 1e-3)
+    frac = f"if(lt({m},{seg_sec:.3f}),0,if(gte({m},{cycle - seg_sec:.3f}),1,({m}-{seg_sec:.3f})/{span:.3f}))"
+    bg = (
+        f"[0:v]tpad=stop_mode=clone:stop_duration={duration:.3f},crop=w='min(iw,{w})':h='min(ih,{h})':x=0:y='(ih-oh)*{frac}',"
+        f"pad={w}:{h}:0:0:black,setsar=1"
+    )
+    if gpu:
+        return (
+            f"{bg},format=nv12,hwupload_cuda[bg];"
+            f"[1:v]scale_cuda={face_w}:{face_h}[face];"
+            f"[bg][face]overlay_cuda=x={x}:y={y}[v]"
+        )
+    return (
+        f"{bg}[bg];"
+        f"[1:v]scale={face_w}:{face_h}[face];"
+        f"[bg][face]overlay={x}:{y}:eof_action=pass,fps={fps},format=yuv420p[v]"
+    )
+
+def prepare_overlay(overlay_path, cache_dir):
+    """Optimise + probe an overlay once: (path, width, height, duration) or None"""
+    try:
+        optimized = ensure_overlay_optimized(Path(overlay_path), cache_dir)
+        return (optimized, *probe_overlay(optimized))
+    except Exception as e:
+        print(f"[ERROR] Overlay {overlay_path} unusable: {e}")
+        return None
 
 def ensure_overlay_optimized(overlay_path, cache_dir):
     if not DO_COMPRESS_OVERLAY:
@@ -406,61 +698,93 @@ def ensure_overlay_optimized(overlay_path, cache_dir):
     
     cache_dir.mkdir(parents=True, exist_ok=True)
     
-    h = hashlib.md5(str(overlay_path).encode()).hexdigest()[:12]
-    cached = cache_dir / f"{overlay_path.stem}_{h}_opt.mp4"
+    # Keyed on content + encode settings, not the source name
+    with open(overlay_path, "rb") as f:
+        head = f.read(1 << 20)
+    params = f"{overlay_path.stat().st_size}:{OVERLAY_TARGET_W}:{OVERLAY_A_KBPS}".encode()
+    h = hashlib.blake2b(head + params, digest_size=8).hexdigest()
+    cached = cache_dir / f"overlay_{h}_opt.mp4"
     
     if cached.exists():
         return cached
     
-    cmd = [
-        "ffmpeg","-y","-i",str(overlay_path),
-        "-vf",f"scale={OVERLAY_TARGET_W}:-2",
-        "-c:v","libx264","-preset","fast","-crf","23",
-        "-c:a","aac","-b:a",f"{OVERLAY_A_KBPS}k",
-        "-movflags","+faststart",
-        str(cached)
-    ]
-    try:
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return cached
-    except:
-        return overlay_path
+    # Full GPU -> NVDEC + NVENC -> libx264
+    scale = f"scale={OVERLAY_TARGET_W}:-2"
+    nvenc = ["-c:v","h264_nvenc","-preset","p4","-rc","vbr","-cq","23"]
+    passes = [([], scale, ["-c:v","libx264","-preset","fast","-crf","23"])]
+    if NVENC:
+        passes.insert(0, (["-hwaccel","cuda"], scale, [*nvenc,"-pix_fmt","yuv420p"]))
+    if CUDA_FILTERS:
+        passes.insert(0, (["-hwaccel","cuda","-hwaccel_output_format","cuda"],
+                          f"scale_cuda={OVERLAY_TARGET_W}:-2", nvenc))
+    
+    fd, temp = tempfile.mkstemp(dir=cache_dir, prefix=f"{cached.stem}.", suffix=".tmp.mp4")
+    os.fchmod(fd, 0o644)
+    os.close(fd)
+    temp = Path(temp)
+    for hwaccel, vf, vcodec in passes:
+        cmd = [
+            "ffmpeg","-y",*hwaccel,"-i",str(overlay_path),
+            "-vf",vf,
+            *vcodec,
+            "-c:a","aac","-b:a",f"{OVERLAY_A_KBPS}k",
+            "-movflags","+faststart",
+            str(temp)
+        ]
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            temp.replace(cached)
+            return cached
+        except Exception:
+            if temp.exists():
+                temp.unlink()
+    return overlay_path
 
-def write_video_atomic(comp, out_path, fps, audio_clip, logger):
-    """✅ FIXED: Includes pixel format and better quality"""
+async def render_video(screenshot_path, overlay_path, out_path, duration, layout, tag=""):
+    """✅ Single ffmpeg pass: screenshot + overlay -> mp4 (layout is (seg_sec, face_w, face_h, x, y))"""
+    if CUDA_FILTERS:
+        try:
+            return await _run_render(screenshot_path, overlay_path, out_path, duration, layout, gpu=True)
+        except RuntimeError as e:
+            print(f"{tag} -> CUDA render failed, retrying on CPU: {e}")
+    return await _run_render(screenshot_path, overlay_path, out_path, duration, layout, gpu=False)
+
+async def _run_render(screenshot_path, overlay_path, out_path, duration, layout, gpu):
     temp = out_path.with_suffix(".tmp.mp4")
+    hwaccel = ["-hwaccel","cuda","-hwaccel_output_format","cuda"] if gpu else []
+    graph = build_filtergraph(WIDTH, HEIGHT, FPS, duration, *layout, gpu=gpu)
     
-    try:
-        result = subprocess.run(
-            ["ffmpeg","-hide_banner","-encoders"],
-            capture_output=True, text=True, timeout=5
-        )
-        use_nvenc = ("h264_nvenc" in result.stdout)
-    except:
-        use_nvenc = False
-    
-    if use_nvenc:
-        vcodec = "h264_nvenc"
-        params = ["-preset","p4","-cq","18","-pix_fmt","yuv420p"]  # ✅ Better quality
+    # Mostly-static content: one long GOP, no B-frames
+    if NVENC:
+        vcodec = ["-c:v","h264_nvenc","-preset","p1","-rc","vbr","-cq","18","-g","9999","-bf","0"]
     else:
-        vcodec = "libx264"
-        params = ["-preset","fast","-crf","18"]
+        vcodec = ["-c:v","libx264","-preset","veryfast","-tune","stillimage","-crf","18","-g","9999",
+                  "-threads",str(X264_THREADS),"-x264-params","lookahead-threads=1"]
     
-    comp.write_videofile(
-        str(temp),
-        fps=fps,
-        codec=vcodec,
-        audio_codec="aac",
-        ffmpeg_params=params,
-        logger=logger,
-        threads=4
+    cmd = [
+        "ffmpeg","-y","-hide_banner","-loglevel","error",
+        "-framerate",str(FPS),"-i",str(screenshot_path),
+        *hwaccel,"-i",str(overlay_path),
+        "-filter_complex",graph,
+        "-map","[v]","-map","1:a?",
+        *vcodec,
+        "-c:a","aac",
+        "-t",f"{duration:.3f}",
+        "-movflags","+faststart",
+        str(temp)
+    ]
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
     )
+    _, err = await proc.communicate()
+    if proc.returncode != 0:
+        if temp.exists():
+            temp.unlink()
+        raise RuntimeError(err.decode(errors="replace").strip() or f"ffmpeg exited with {proc.returncode}")
     
-    if temp.exists():
-        if out_path.exists():
-            out_path.unlink()
-        temp.rename(out_path)
-    
+    if out_path.exists():
+        out_path.unlink()
+    temp.rename(out_path)
     return out_path
 
 def unique_path(base_path):
@@ -475,7 +799,123 @@ def unique_path(base_path):
         i += 1
 
 # ================== MAIN ==================
-def main():
+async def process_row(i, total, r, contexts, overlays, outdir, r2_client,
+                      headless_mode, encode_sem, grand_start):
+    """Screenshot, render and upload one CSV row; returns its results-CSV entry"""
+    url = clean_url(r["url"])
+    username = (r.get("username") or "").strip() or domain_from_url(url)
+    niche = r.get("niche", "").strip()
+    slug = r.get("slug") or safe_slug(username)
+    shot = SCRATCH_DIR/f"vg{WORKER_ID}_{i}_{slug}_screenshot.jpg"
+    outvid = outdir/f"{slug}.mp4"
+    thumbnail_file = outdir/f"{slug}.jpg"
+
+    tag = f"[{i}/{total}]"
+    print(f"{tag} {url} | {username} | niche: {niche}")
+
+    if headless_mode:
+        overlay = overlays.get(niche)
+        if not overlay:
+            print(f"{tag} -> skipped (no overlay for niche: {niche})")
+            return {
+                "Website URL": url,
+                "Instagram Username": username,
+                "Niche": niche,
+                "Video Link": "FAILED - Missing overlay"
+            }
+    else:
+        overlay = overlays.get("default")
+    overlay_path_opt, face_w_src, face_h_src, overlay_duration = overlay
+
+    if not await capture_screenshot(contexts,url,shot,WIDTH,HEIGHT,tag):
+        print(f"{tag} -> skipped (capture failed)")
+        return {
+            "Website URL": url,
+            "Instagram Username": username,
+            "Niche": niche,
+            "Video Link": "FAILED - Screenshot failed"
+        }
+
+    seg_sec = random.uniform(SEGMENT_MIN_SEC, SEGMENT_MAX_SEC)
+    video_start = time.time()
+    layout = None
+    landing_url = None
+
+    try:
+        width_frac = OVERLAY_W_FRAC_BASE * (1.0 + random.uniform(-OVERLAY_W_JITTER, OVERLAY_W_JITTER))
+        face_w = max(120, int(WIDTH * width_frac))
+        scaled_h = int(face_h_src * (face_w / face_w_src))
+        dx = random.randint(-OVERLAY_POS_JITTER, OVERLAY_POS_JITTER)
+        dy = random.randint(-OVERLAY_POS_JITTER, OVERLAY_POS_JITTER)
+        x = max(SCROLL_MARGIN, min(WIDTH - face_w - SCROLL_MARGIN, WIDTH - face_w - SCROLL_MARGIN + dx))
+        y = max(SCROLL_MARGIN, min(HEIGHT - scaled_h - SCROLL_MARGIN, HEIGHT - scaled_h - SCROLL_MARGIN + dy))
+
+        # ✅ NEW: 5-second scroll loop + face overlay rendered entirely by ffmpeg
+        layout = (seg_sec, face_w, scaled_h, x, y)
+        async with encode_sem:
+            final_path = await render_video(shot, overlay_path_opt, outvid, overlay_duration, layout, tag)
+
+        # ✅ NEW: Extract thumbnail
+        has_thumbnail = await extract_thumbnail(final_path, thumbnail_file, tag)
+
+        # Landing page only after the video (and poster) actually uploaded
+        if r2_client:
+            uploads = [upload_to_r2(r2_client, final_path, username, tag)]
+            if has_thumbnail:
+                uploads.append(upload_thumbnail_to_r2(r2_client, thumbnail_file, username, tag))
+            video_url, *thumb = await asyncio.gather(*uploads)
+            poster_url = (thumb[0] if thumb else None) or video_url
+            if not video_url:
+                landing_url = None
+            elif SKIP_LANDING:
+                landing_url = video_url
+            else:
+                landing_url = await create_landing_page(r2_client, username, video_url, poster_url, tag)
+                if landing_url:
+                    print(f"{tag} -> landing page: {landing_url}")
+
+    except Exception as e:
+        msg = str(e)
+        if "Permission denied" in msg or "permission denied" in msg:
+            try:
+                alt = unique_path(outvid)
+                print(f"{tag} -> target locked; writing to {alt.name} instead")
+                async with encode_sem:
+                    final_path = await render_video(shot, overlay_path_opt, alt, overlay_duration, layout, tag)
+            except Exception as e2:
+                print(f"{tag} -> render failed: {e2}")
+                return {
+                    "Website URL": url,
+                    "Instagram Username": username,
+                    "Niche": niche,
+                    "Video Link": f"FAILED - {str(e2)}"
+                }
+        else:
+            print(f"{tag} -> render failed: {e}")
+            return {
+                "Website URL": url,
+                "Instagram Username": username,
+                "Niche": niche,
+                "Video Link": f"FAILED - {str(e)}"
+            }
+    finally:
+        try:
+            shot.unlink()
+        except OSError:
+            pass
+
+    per_video = time.time() - video_start
+    total_elapsed = time.time() - grand_start
+    print(f"{tag} -> saved {Path(final_path).name} | {per_video:.1f}s | ⏱ {timedelta(seconds=int(total_elapsed))}")
+
+    return {
+        "Website URL": url,
+        "Instagram Username": username,
+        "Niche": niche,
+        "Video Link": landing_url or Path(final_path).resolve().as_uri()
+    }
+
+async def main():
     headless_mode = os.getenv("WORKER_ID") is not None
     
     check_nvenc()
@@ -494,13 +934,14 @@ def main():
         
         try:
             print(f"[INFO] Downloading {CSV_FILENAME} from R2...")
-            r2_client.download_file(R2_BUCKET, CSV_FILENAME, str(csv_path))
+            await asyncio.to_thread(r2_client.download_file, R2_BUCKET, CSV_FILENAME, str(csv_path), Config=XFER)
             print("[SUCCESS] CSV downloaded")
         except Exception as e:
             print(f"[ERROR] CSV download failed: {e}")
             return
         
-        overlays = download_overlays_from_r2(csv_path, r2_client, R2_BUCKET)
+        rows = load_rows(csv_path)
+        overlays = await asyncio.to_thread(download_overlays_from_r2, rows, r2_client, R2_BUCKET)
         
     else:
         print("👉 Select your CSV")
@@ -520,8 +961,8 @@ def main():
             return
         r2_client = setup_r2_client()
         overlays = {"default": overlay_src}
+        rows = load_rows(csv_path)
 
-    rows = load_rows(csv_path)
     if not rows:
         print("[ERROR] No valid rows in CSV.")
         return
@@ -533,191 +974,77 @@ def main():
 
     print(f"[INFO] {len(rows)} rows | {WIDTH}x{HEIGHT}@{FPS}")
     outdir.mkdir(parents=True,exist_ok=True)
-    silent = SilentLogger()
+
+    # Optimise/probe each overlay once
+    keys = [k for k, path in overlays.items() if path]
+    prepared = await asyncio.gather(
+        *(asyncio.to_thread(prepare_overlay, overlays[k], outdir/"_cache") for k in keys)
+    )
+    overlays = dict(zip(keys, prepared))
+    if not headless_mode and not overlays.get("default"):
+        print("[ERROR] Overlay could not be prepared")
+        return
     grand_start = time.time()
     results = []
 
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(headless=True, args=["--disable-gpu","--no-sandbox"])
-        context = browser.new_context(
-            viewport={"width": WIDTH, "height": HEIGHT},
-            user_agent=USER_AGENT,
-            java_script_enabled=True,
-            ignore_https_errors=True,
-            device_scale_factor=1.0
-        )
-        page = context.new_page()
-
-        total = len(rows)
-        for i,r in enumerate(rows,1):
-            url = clean_url(r["url"])
-            username = (r.get("username") or "").strip() or domain_from_url(url)
-            niche = r.get("niche", "").strip()
-            slug = safe_slug(username)
-            shot = outdir/f"{slug}.png"
-            outvid = outdir/f"{slug}.mp4"
-            thumbnail_file = outdir/f"{slug}.jpg"
-
-            print(f"[{i}/{total}] {url} | {username} | niche: {niche}")
-
-            if headless_mode:
-                overlay_path = overlays.get(niche)
-                if not overlay_path:
-                    print(f"   -> skipped (no overlay for niche: {niche})")
-                    results.append({
-                        "Website URL": url,
-                        "Instagram Username": username,
-                        "Niche": niche,
-                        "Video Link": "FAILED - Missing overlay"
-                    })
-                    continue
-            else:
-                overlay_path = overlays.get("default")
-
-            if not capture_fullpage_png(page,url,shot,WIDTH,HEIGHT):
-                print("   -> skipped (capture failed)")
-                results.append({
-                    "Website URL": url,
-                    "Instagram Username": username,
-                    "Niche": niche,
-                    "Video Link": "FAILED - Screenshot failed"
-                })
-                continue
-
-            if i % 50 == 0:
-                context.close()
-                browser.close()
-                browser = pw.chromium.launch(headless=True, args=["--disable-gpu","--no-sandbox"])
-                context = browser.new_context(
-                    viewport={"width": WIDTH, "height": HEIGHT},
-                    user_agent=USER_AGENT,
-                    java_script_enabled=True,
-                    ignore_https_errors=True,
-                    device_scale_factor=1.0
-                )
-                page = context.new_page()
-
-            overlay_path_opt = ensure_overlay_optimized(Path(overlay_path), outdir/"_cache")
-            
-            seg_sec = random.uniform(SEGMENT_MIN_SEC, SEGMENT_MAX_SEC)
-            video_start = time.time()
-            scroll = None
-            face_layer = None
-            comp = None
-            face_full = None
-            
-            try:
-                face_full = VideoFileClip(str(overlay_path_opt))
-                overlay_duration = float(face_full.duration or 30)
-                
-                # ✅ NEW: Create 5-second scroll and loop it
-                scroll_5sec = build_scrolling_clip(shot, WIDTH, HEIGHT, 5.0, FPS, seg_sec)
-                num_loops = int(overlay_duration / 5) + 1
-                scroll = scroll_5sec.loop(n=num_loops).set_duration(overlay_duration)
-                
-                layers = [scroll]
-
-                if face_full is not None:
-                    width_frac = OVERLAY_W_FRAC_BASE * (1.0 + random.uniform(-OVERLAY_W_JITTER, OVERLAY_W_JITTER))
-                    face_w = max(120, int(WIDTH * width_frac))
-                    scaled_h = int(face_full.h * (face_w / face_full.w))
-                    dx = random.randint(-OVERLAY_POS_JITTER, OVERLAY_POS_JITTER)
-                    dy = random.randint(-OVERLAY_POS_JITTER, OVERLAY_POS_JITTER)
-                    x = max(SCROLL_MARGIN, min(WIDTH - face_w - SCROLL_MARGIN, WIDTH - face_w - SCROLL_MARGIN + dx))
-                    y = max(SCROLL_MARGIN, min(HEIGHT - scaled_h - SCROLL_MARGIN, HEIGHT - scaled_h - SCROLL_MARGIN + dy))
-                    face_layer = face_full.resize(width=face_w).set_position((x, y)).subclip(0, overlay_duration)
-                    layers.append(face_layer)
-
-                comp = CompositeVideoClip(layers, size=(WIDTH, HEIGHT)).set_duration(overlay_duration)
-                if face_full is not None and face_full.audio is not None:
-                    comp = comp.set_audio(face_full.audio.subclip(0, overlay_duration))
-
-                final_path = write_video_atomic(comp, outvid, FPS, (face_full.audio if face_full else None), silent)
-
-                # ✅ NEW: Extract thumbnail
-                thumbnail_url = None
-                if extract_thumbnail(final_path, thumbnail_file):
-                    if r2_client:
-                        thumbnail_url = upload_thumbnail_to_r2(r2_client, thumbnail_file, username)
-
-                # Upload video and create landing page
-                video_url = None
-                landing_url = None
-                if r2_client:
-                    video_url = upload_to_r2(r2_client, final_path, username)
-                    if video_url:
-                        landing_url = create_landing_page(r2_client, username, video_url, thumbnail_url or video_url)
-                        if landing_url:
-                            print(f"   -> landing page: {landing_url}")
-
-            except Exception as e:
-                msg = str(e)
-                if "Permission denied" in msg or "permission denied" in msg:
-                    try:
-                        alt = unique_path(outvid)
-                        print(f"   -> target locked; writing to {alt.name} instead")
-                        final_path = write_video_atomic(comp, alt, FPS, (face_full.audio if face_full else None), silent)
-                    except Exception as e2:
-                        print(f"   -> render failed: {e2}")
-                        results.append({
-                            "Website URL": url,
-                            "Instagram Username": username,
-                            "Niche": niche,
-                            "Video Link": f"FAILED - {str(e2)}"
-                        })
-                        continue
-                else:
-                    print(f"   -> render failed: {e}")
-                    results.append({
-                        "Website URL": url,
-                        "Instagram Username": username,
-                        "Niche": niche,
-                        "Video Link": f"FAILED - {str(e)}"
-                    })
-                    continue
-            finally:
-                try:
-                    if comp: comp.close()
-                except: pass
-                try:
-                    if face_layer: face_layer.close()
-                except: pass
-                try:
-                    if scroll: scroll.close()
-                except: pass
-                try:
-                    if face_full: face_full.close()
-                except: pass
-
-            per_video = time.time() - video_start
-            total_elapsed = time.time() - grand_start
-            print(f"   -> saved {Path(final_path).name} | {per_video:.1f}s | ⏱ {timedelta(seconds=int(total_elapsed))}")
-
-            result = {
-                "Website URL": url,
-                "Instagram Username": username,
-                "Niche": niche,
-                "Video Link": landing_url or Path(final_path).resolve().as_uri()
-            }
-            results.append(result)
-
-        context.close()
-        browser.close()
+    sem = asyncio.Semaphore(max(1, CONCURRENCY))
+    encode_sem = asyncio.Semaphore(ENCODE_CONCURRENCY)
+    total = len(rows)
 
+    # Results are appended as rows finish, so a crash keeps what's done
     res_csv = outdir / f"RESULTS_worker{WORKER_ID}.csv"
+    res_file = None
+    w = None
     try:
-        with open(res_csv, "w", encoding="utf-8", newline="") as f:
-            w = csv.DictWriter(f, fieldnames=["Website URL","Instagram Username","Niche","Video Link"])
-            w.writeheader()
-            w.writerows(results)
+        res_file = open(res_csv, "w", encoding="utf-8", newline="")
+        w = csv.DictWriter(res_file, fieldnames=["Website URL","Instagram Username","Niche","Video Link"])
+        w.writeheader()
     except Exception as e:
         print(f"[WARN] Could not write results CSV: {e}")
 
+    async def handle(i, r, contexts):
+        async with sem:
+            result = await process_row(i, total, r, contexts, overlays, outdir, r2_client,
+                                       headless_mode, encode_sem, grand_start)
+        results.append(result)
+        if w:
+            try:
+                w.writerow(result)
+                res_file.flush()
+            except Exception as e:
+                print(f"[WARN] Could not write results CSV: {e}")
+        return result
+
+    try:
+        async with async_playwright() as pw:
+            contexts = ContextPool(pw, max(1, CONCURRENCY), BROWSER_RECYCLE_ROWS)
+            try:
+                await asyncio.gather(*(handle(i, r, contexts) for i, r in enumerate(rows, 1)))
+            finally:
+                await contexts.close()
+    finally:
+        if res_file:
+            res_file.close()
+
+    if headless_mode and r2_client and res_file:
+        try:
+            await asyncio.to_thread(
+                r2_client.upload_file,
+                str(res_csv),
+                R2_BUCKET,
+                f"results/{res_csv.name}",
+                ExtraArgs={'ContentType': 'text/csv'},
+                Config=XFER
+            )
+            print(f"[INFO] Results uploaded to R2: results/{res_csv.name}")
+        except Exception as e:
+            print(f"[WARN] Results upload failed: {e}")
+
     print(f"\n✅ Done. {len(results)}/{len(rows)} videos. Results: {res_csv}")
     print(f"⏱️ Total elapsed: {timedelta(seconds=int(time.time()-grand_start))}")
 
 if __name__=="__main__":
     try:
-        main()
+        asyncio.run(main())
     except KeyboardInterrupt:
         print("\n[ABORTED]")